@@ -1,12 +1,40 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from time import perf_counter
 
 import pandas as pd
 from fastapi import FastAPI, File, HTTPException, UploadFile
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, Field, StrictBool, model_validator
+
+from .core import compute_quality_flags, missing_table, read_csv, summarize_dataset
+
+
+async def _run_in_pool(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Без lifespan (например, TestClient без with) пула нет – тогда берём
+    # стандартный executor event loop'а
+    pool = getattr(app.state, "pool", None)
+    return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Общий пул потоков для парсинга CSV и EDA-ядра: создаётся один раз на запуск
+    # приложения, а не на каждый запрос, и лежит в app.state.pool
+    app.state.pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+    try:
+        yield
+    finally:
+        pool = app.state.pool
+        del app.state.pool
+        pool.shutdown(wait=False, cancel_futures=True)
 
-from .core import compute_quality_flags, missing_table, summarize_dataset
 
 app = FastAPI(
     title="AIE Dataset Quality API",
@@ -17,8 +45,25 @@ app = FastAPI(
     ),
     docs_url="/docs",
     redoc_url=None,
+    lifespan=_lifespan,
 )
 
+# Ответы больше 1 КБ отдаём сжатыми, если клиент поддерживает gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# CSV-загрузка: подходящий content-type и расширение имени файла одновременно
+_ALLOWED_CONTENT_TYPES = frozenset({"text/csv", "application/vnd.ms-excel", "application/octet-stream"})
+_ALLOWED_EXTS = frozenset({".csv", ".txt"})
+
+
+def _is_csv_upload(file: UploadFile) -> bool:
+    if file.content_type not in _ALLOWED_CONTENT_TYPES:
+        return False
+    if file.filename is None:
+        return False
+    return os.path.splitext(file.filename)[1].lower() in _ALLOWED_EXTS
+
+
 ######## Реализация /metrics со статистикой по использованию сервера ########
 from fastapi import Request
 
@@ -101,6 +146,25 @@ class QualityRequest(BaseModel):
     )
 
 
+class DataFrameRequest(BaseModel):
+    """Таблица целиком, переданная в JSON: колонка -> список значений."""
+
+    columns: dict[str, list[StrictBool | int | float | str | None]] = Field(
+        ...,
+        description="Значения по колонкам: {'имя': [v1, v2, ...], ...}; только скаляры",
+    )
+    dtypes: dict[str, str] | None = Field(
+        default=None,
+        description="Явные типы колонок (например, {'user_id': 'int64'}); без них типы выводятся",
+    )
+
+    @model_validator(mode="after")
+    def _check_lengths(self) -> "DataFrameRequest":
+        if len({len(values) for values in self.columns.values()}) > 1:
+            raise ValueError("Все колонки должны быть одной длины")
+        return self
+
+
 class QualityResponse(BaseModel):
     """Ответ заглушки модели качества датасета."""
 
@@ -131,6 +195,10 @@ class QualityResponse(BaseModel):
         default=None,
         description="Размеры датасета: {'n_rows': ..., 'n_cols': ...}, если известны",
     )
+    problematic_columns: list[str] | None = Field(
+        default=None,
+        description="Проблемные колонки из compute_quality_flags, если считались по реальным данным",
+    )
 
 
 # ---------- Системный эндпоинт ----------
@@ -220,6 +288,64 @@ def quality(req: QualityRequest) -> QualityResponse:
     )
 
 
+# ---------- Общая оценка качества DataFrame через EDA-ядро ----------
+
+
+async def _quality_response(
+    df: pd.DataFrame,
+    start: float,
+    log_prefix: str,
+    ok_message: str,
+    fail_message: str,
+) -> QualityResponse:
+    """
+    Запускает EDA-ядро (summarize_dataset + missing_table + compute_quality_flags)
+    по уже прочитанному DataFrame и собирает QualityResponse.
+    start – perf_counter() на входе в эндпоинт, для latency_ms.
+    """
+
+    # CPU-нагрузку pandas уносим в пул потоков
+    summary, missing_df = await asyncio.gather(
+        _run_in_pool(summarize_dataset, df),
+        _run_in_pool(missing_table, df),
+    )
+    flags_all = await _run_in_pool(compute_quality_flags, summary, missing_df)
+
+    # Ожидаем, что compute_quality_flags вернёт quality_score в [0,1]
+    score = float(flags_all.get("quality_score", 0.0))
+    score = max(0.0, min(1.0, score))
+    ok_for_model = score >= 0.7
+    message = ok_message if ok_for_model else fail_message
+
+    latency_ms = (perf_counter() - start) * 1000.0
+
+    # Оставляем только булевы флаги для компактности
+    flags_bool: dict[str, bool] = {
+        key: bool(value)
+        for key, value in flags_all.items()
+        if isinstance(value, bool)
+    }
+
+    print(
+        f"{log_prefix} n_rows={summary.n_rows} n_cols={summary.n_cols} "
+        f"score={score:.3f} latency_ms={latency_ms:.1f} ms"
+    )
+
+    ################### Для /metrics ##################
+    _METRICS_RUNTIME["last_ok_for_model"] = ok_for_model
+    ###################################################
+
+    return QualityResponse(
+        ok_for_model=ok_for_model,
+        quality_score=score,
+        message=message,
+        latency_ms=latency_ms,
+        flags=flags_bool,
+        dataset_shape={"n_rows": summary.n_rows, "n_cols": summary.n_cols},
+        problematic_columns=flags_all["problematic_columns"],
+    )
+
+
 # ---------- /quality-from-csv: реальный CSV через нашу EDA-логику ----------
 
 
@@ -240,70 +366,68 @@ async def quality_from_csv(file: UploadFile = File(...)) -> QualityResponse:
 
     start = perf_counter()
 
-    if file.content_type not in ("text/csv", "application/vnd.ms-excel", "application/octet-stream"):
+    if not _is_csv_upload(file):
         # content_type от браузера может быть разным, поэтому проверка мягкая
         # но для демонстрации оставим простую ветку 400
         raise HTTPException(status_code=400, detail="Ожидается CSV-файл (content-type text/csv).")
 
     try:
-        # FastAPI даёт file.file как file-like объект, который можно читать pandas'ом
-        df = pd.read_csv(file.file)
+        # FastAPI даёт file.file как file-like объект (SpooledTemporaryFile), который можно
+        # читать pandas'ом без буферизации всего тела; парсинг уносим в пул потоков,
+        # чтобы не блокировать event loop
+        df = await _run_in_pool(read_csv, file.file, encoding="utf-8")
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
 
     if df.empty:
         raise HTTPException(status_code=400, detail="CSV-файл не содержит данных (пустой DataFrame).")
 
-    # Используем EDA-ядро из S03
-    summary = summarize_dataset(df)
-    missing_df = missing_table(df)
-    flags_all = compute_quality_flags(summary, missing_df)
-
-    # Ожидаем, что compute_quality_flags вернёт quality_score в [0,1]
-    score = float(flags_all.get("quality_score", 0.0))
-    score = max(0.0, min(1.0, score))
-    ok_for_model = score >= 0.7
+    return await _quality_response(
+        df,
+        start,
+        log_prefix=f"[quality-from-csv] filename={file.filename!r}",
+        ok_message="CSV выглядит достаточно качественным для обучения модели (по текущим эвристикам).",
+        fail_message="CSV требует доработки перед обучением модели (по текущим эвристикам).",
+    )
 
-    if ok_for_model:
-        message = "CSV выглядит достаточно качественным для обучения модели (по текущим эвристикам)."
-    else:
-        message = "CSV требует доработки перед обучением модели (по текущим эвристикам)."
 
-    latency_ms = (perf_counter() - start) * 1000.0
+# ---------- /quality-from-dataframe: таблица прямо в JSON ----------
 
-    # Оставляем только булевы флаги для компактности
-    flags_bool: dict[str, bool] = {
-        key: bool(value)
-        for key, value in flags_all.items()
-        if isinstance(value, bool)
-    }
 
-    # Размеры датасета берём из summary (если там есть поля n_rows/n_cols),
-    # иначе — напрямую из DataFrame.
-    try:
-        n_rows = int(getattr(summary, "n_rows"))
-        n_cols = int(getattr(summary, "n_cols"))
-    except AttributeError:
-        n_rows = int(df.shape[0])
-        n_cols = int(df.shape[1])
+@app.post(
+    "/quality-from-dataframe",
+    response_model=QualityResponse,
+    tags=["quality"],
+    summary="Оценка качества по таблице, переданной в JSON",
+)
+async def quality_from_dataframe(req: DataFrameRequest) -> QualityResponse:
+    """
+    Эндпоинт принимает таблицу в виде {"columns": {"имя": [значения, ...], ...}}
+    и, опционально, {"dtypes": {"имя": "int64", ...}}. Структуру тела проверяет
+    pydantic (422 до построения DataFrame). Если dtypes переданы, pandas не
+    выводит типы сам; иначе типы приводятся через convert_dtypes.
+    """
 
-    print(
-        f"[quality-from-csv] filename={file.filename!r} "
-        f"n_rows={n_rows} n_cols={n_cols} score={score:.3f} "
-        f"latency_ms={latency_ms:.1f} ms"
-    )
+    start = perf_counter()
 
-    ################### Для /metrics ##################
-    _METRICS_RUNTIME["last_ok_for_model"] = ok_for_model
-    ###################################################
+    try:
+        df = pd.DataFrame.from_dict(req.columns)
+        if req.dtypes is not None:
+            df = df.astype(req.dtypes)
+        else:
+            df = df.convert_dtypes(dtype_backend="numpy_nullable")
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail=f"Не удалось построить DataFrame: {exc}")
 
-    return QualityResponse(
-        ok_for_model=ok_for_model,
-        quality_score=score,
-        message=message,
-        latency_ms=latency_ms,
-        flags=flags_bool,
-        dataset_shape={"n_rows": n_rows, "n_cols": n_cols},
+    if df.empty:
+        raise HTTPException(status_code=400, detail="Таблица не содержит данных (пустой DataFrame).")
+
+    return await _quality_response(
+        df,
+        start,
+        log_prefix="[quality-from-dataframe]",
+        ok_message="Таблица выглядит достаточно качественной для обучения модели (по текущим эвристикам).",
+        fail_message="Таблица требует доработки перед обучением модели (по текущим эвристикам).",
     )
 
 
@@ -336,20 +460,23 @@ async def quality_flags_from_csv(file: UploadFile = File(...)) -> CsvQualityFlag
         Эндпоинт принимает CSV-файл и возвращает булевы флаги по его качеству для анализа
     """
 
-    if file.content_type not in ("text/csv", "application/vnd.ms-excel", "application/octet-stream"):
+    if not _is_csv_upload(file):
         raise HTTPException(status_code=400, detail="Ожидается CSV-файл (content-type text/csv).")
 
     try:
-        df = pd.read_csv(file.file)
+        df = await _run_in_pool(read_csv, file.file, encoding="utf-8")
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
 
     if df.empty:
         raise HTTPException(status_code=400, detail="CSV-файл не содержит данных (пустой DataFrame).")
 
-    summary = summarize_dataset(df)
-    missing_df = missing_table(df)
+    summary, missing_df = await asyncio.gather(
+        _run_in_pool(summarize_dataset, df),
+        _run_in_pool(missing_table, df),
+    )
+    flags = await _run_in_pool(compute_quality_flags, summary, missing_df)
 
-    return CsvQualityFlagsResponse(flags=compute_quality_flags(summary, missing_df))
+    return CsvQualityFlagsResponse(flags=flags)
 
 #############################################################################
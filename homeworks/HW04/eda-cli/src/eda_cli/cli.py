@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 import pandas as pd
 import typer
+from pandas.api import types as ptypes
+
+# orjson – опциональная зависимость: сериализует заметно быстрее stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .core import (
     DatasetSummary,
@@ -12,8 +22,11 @@ from .core import (
     correlation_matrix,
     flatten_summary_for_print,
     missing_table,
+    precompute_stats,
+    read_csv,
     summarize_dataset,
     top_categories,
+    write_csv,
 )
 from .viz import (
     plot_correlation_heatmap,
@@ -33,11 +46,67 @@ def _load_csv(
     if not path.exists():
         raise typer.BadParameter(f"Файл '{path}' не найден")
     try:
-        return pd.read_csv(path, sep=sep, encoding=encoding)
+        return read_csv(path, sep=sep, encoding=encoding)
     except Exception as exc:  # noqa: BLE001
         raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
 
 
+def _json_safe(value):
+    """NaN/inf -> None, чтобы orjson и stdlib json давали одинаковый валидный JSON."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def _write_json(path: Path, data: dict) -> None:
+    data = _json_safe(data)
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2, allow_nan=False), encoding="utf-8")
+
+
+def _write_empty_report(
+        out_root: Path,
+        title: str,
+        source_name: str,
+        df: pd.DataFrame,
+        json_summary: bool = False,
+) -> list[Path]:
+    """
+    Минимальный report.md (и summary.json, если запрошен) для пустого/вырожденного
+    датасета – без таблиц и картинок. Возвращает список записанных файлов.
+    """
+    md_path = out_root / "report.md"
+    md_path.write_text(
+        f"# {title.strip()}\n\n"
+        f"Исходный файл: `{source_name}`\n\n"
+        f"Строк: **{df.shape[0]}**, столбцов: **{df.shape[1]}**\n\n"
+        "Датасет пуст или содержит меньше 2 строк – анализ и графики не строились.\n",
+        encoding="utf-8",
+    )
+    written = [md_path]
+
+    if json_summary:
+        # На паре строк summary и флаги считаются мгновенно
+        summary = summarize_dataset(df)
+        json_path = out_root / "summary.json"
+        _write_json(
+            json_path,
+            {
+                "summary": summary.to_dict(),
+                "quality_flags": compute_quality_flags(summary, missing_table(df)),
+            },
+        )
+        written.append(json_path)
+
+    return written
+
+
 @app.command()
 def head(
         path: str = typer.Argument(..., help="Путь к CSV-файлу."),
@@ -83,7 +152,8 @@ def report(
         max_hist_columns: int = typer.Option(6, help="Максимум числовых колонок для гистограмм."),
         title: str = typer.Option("Отчёт по датасету", help="Заголовок для отчёта"),
         min_missing_share: int = typer.Option(25,
-                                              help="Минимальный порог пропущенных значений в колонке (в %) для вывода в отдельный список")
+                                              help="Минимальный порог пропущенных значений в колонке (в %) для вывода в отдельный список"),
+        json_summary: bool = typer.Option(False, help="Дополнительно сохранить summary.json с обзором и флагами качества."),
 ) -> None:
     """
     Сгенерировать полный EDA-отчёт:
@@ -97,90 +167,156 @@ def report(
     if not (0 <= min_missing_share <= 100):
         raise typer.BadParameter("--min-missing-share in [0; 100]")
 
+    src_path = Path(path)
     out_root = Path(out_dir)
     out_root.mkdir(parents=True, exist_ok=True)
 
-    df = _load_csv(Path(path), sep=sep, encoding=encoding)
+    df = _load_csv(src_path, sep=sep, encoding=encoding)
+
+    # На пустом или вырожденном датасете считать и рисовать нечего
+    if df.empty or len(df) < 2:
+        written = _write_empty_report(out_root, title, src_path.name, df, json_summary=json_summary)
+        typer.echo(f"Датасет пуст или слишком мал, записаны только: {', '.join(str(p) for p in written)}")
+        return
 
-    # 1. Обзор
-    summary = summarize_dataset(df)
+    # 1. Обзор (пропуски/уникальные/числовые статистики считаем один раз)
+    stats = precompute_stats(df)
+    summary = summarize_dataset(df, stats=stats)
     summary_df = flatten_summary_for_print(summary)
-    missing_df = missing_table(df)
-    corr_df = correlation_matrix(df)
+    missing_df = missing_table(df, stats=stats)
+    # Числовые колонки уже известны из summary (bool в summary считается числовым,
+    # но ни в корреляцию, ни в гистограммы он не попадает)
+    numeric_cols = [c.name for c in summary.columns if c.is_numeric and not ptypes.is_bool_dtype(df[c.name])]
+    # Корреляция имеет смысл только при хотя бы двух числовых колонках
+    corr_df = correlation_matrix(df) if len(numeric_cols) >= 2 else pd.DataFrame()
     top_cats = top_categories(df)
 
     # 2. Качество в целом
-    quality_flags = compute_quality_flags(summary, missing_df)
+    quality_flags = compute_quality_flags(summary, missing_df, min_missing_share=min_missing_share / 100)
+    problematic_columns = quality_flags["problematic_columns"]
+    # Колонки, у которых доля пропусков не ниже порога --min-missing-share
+    problematic_missing_cols = quality_flags["high_missing_columns"]
 
     # 3. Сохраняем табличные артефакты
-    summary_df.to_csv(out_root / "summary.csv", index=False)
+    write_csv(summary_df, out_root / "summary.csv", index=False)
     if not missing_df.empty:
-        missing_df.to_csv(out_root / "missing.csv", index=True)
+        write_csv(missing_df, out_root / "missing.csv", index=True)
     if not corr_df.empty:
-        corr_df.to_csv(out_root / "correlation.csv", index=True)
+        write_csv(corr_df, out_root / "correlation.csv", index=True)
     save_top_categories_tables(top_cats, out_root / "top_categories")
+    if json_summary:
+        json_summary_data = {
+            "summary": summary.to_dict(),
+            "quality_flags": quality_flags,
+        }
+        _write_json(out_root / "summary.json", json_summary_data)
 
     # 4. Markdown-отчёт
     md_path = out_root / "report.md"
-    with md_path.open("w", encoding="utf-8") as f:
-        f.write(f"# {title.strip()}\n\n")  # теперь идёт из параметров
-        f.write(f"Исходный файл: `{Path(path).name}`\n\n")
-        f.write(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
-
-        f.write("## Качество данных (эвристики)\n\n")
-        f.write(f"- Оценка качества: **{quality_flags['quality_score']:.2f}**\n")
-        f.write(f"- Макс. доля пропусков по колонке: **{quality_flags['max_missing_share']:.2%}**\n")
-        f.write(f"- Слишком мало строк: **{quality_flags['too_few_rows']}**\n")
-        f.write(f"- Слишком много колонок: **{quality_flags['too_many_columns']}**\n")
-        f.write(f"- Слишком много пропусков: **{quality_flags['too_many_missing']}**\n\n")
-
-        ######### Добавляю свои ############
-        f.write(f"- Есть колонка с полностью одинаковыми значениями: **{quality_flags['has_constant_columns']}**\n\n")
-        f.write(
-            f"- Слишком много уникальных значений в категориальном столбце: **{quality_flags['has_high_cardinality_categoricals']}**\n\n")
-        f.write(f"- Есть поле, похожее на id, с дубликатами: **{quality_flags['has_suspicious_id_duplicates']}**\n\n")
-        ####################################
-
-        f.write("## Колонки\n\n")
-        f.write("См. файл `summary.csv`.\n\n")
-
-        f.write("## Пропуски\n\n")
-        if missing_df.empty:
-            f.write("Пропусков нет или датасет пуст.\n\n")
-        else:
-            ####### Колонки с большими пропусками #######
-            warning_columns_with_missing = missing_df[missing_df["missing_share"] * 100 >= min_missing_share]
-
-            if not warning_columns_with_missing.empty:
-                f.write(f"Столбцы, выходящие за допустимые пределы по порогу пропусков ({min_missing_share}%):\n\n")
-                f.write("\n\n".join(map(lambda column: f"\n\n - {column}", missing_df)))  # выводим красиво
-            #############################################
-            f.write("\n\nСм. файлы `missing.csv` и `missing_matrix.png`.\n\n")
-
-        f.write("## Корреляция числовых признаков\n\n")
-        if corr_df.empty:
-            f.write("Недостаточно числовых колонок для корреляции.\n\n")
-        else:
-            f.write("См. `correlation.csv` и `correlation_heatmap.png`.\n\n")
-
-        f.write("## Категориальные признаки\n\n")
-        if not top_cats:
-            f.write("Категориальные/строковые признаки не найдены.\n\n")
-        else:
-            f.write("См. файлы в папке `top_categories/`.\n\n")
-
-        f.write("## Гистограммы числовых колонок\n\n")
-        f.write("См. файлы `hist_*.png`.\n")
-
-    # 5. Картинки
-    plot_histograms_per_column(df, out_root, max_columns=max_hist_columns)
-    plot_missing_matrix(df, out_root / "missing_matrix.png")
-    plot_correlation_heatmap(df, out_root / "correlation_heatmap.png")
+    quality_score = quality_flags["quality_score"]
+    max_missing_share = quality_flags["max_missing_share"]
+    too_few_rows = quality_flags["too_few_rows"]
+    too_many_columns = quality_flags["too_many_columns"]
+    too_many_missing = quality_flags["too_many_missing"]
+    has_constant_columns = quality_flags["has_constant_columns"]
+    has_high_cardinality = quality_flags["has_high_cardinality_categoricals"]
+    has_id_duplicates = quality_flags["has_suspicious_id_duplicates"]
+
+    # Шапка и блок эвристик (заголовок идёт из параметров)
+    parts: list[str] = [
+        f"""# {title.strip()}
+
+Исходный файл: `{src_path.name}`
+
+Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**
+
+## Качество данных (эвристики)
+
+- Оценка качества: **{quality_score:.2f}**
+- Макс. доля пропусков по колонке: **{max_missing_share:.2%}**
+- Слишком мало строк: **{too_few_rows}**
+- Слишком много колонок: **{too_many_columns}**
+- Слишком много пропусков: **{too_many_missing}**
+
+- Есть колонка с полностью одинаковыми значениями: **{has_constant_columns}**
+
+- Слишком много уникальных значений в категориальном столбце: **{has_high_cardinality}**
+
+- Есть поле, похожее на id, с дубликатами: **{has_id_duplicates}**
+
+## Колонки
+
+См. файл `summary.csv`.
+
+"""
+    ]
+
+    parts.append("## Проблемные колонки\n\n")
+    if not problematic_columns:
+        parts.append("Проблемных колонок не найдено.\n\n")
+    else:
+        parts.append("Константные, высококардинальные, почти без разброса или с большой долей пропусков:\n\n")
+        parts.append("".join(f"- {column}\n" for column in problematic_columns))
+        parts.append("\n")
+
+    parts.append("## Пропуски\n\n")
+    if missing_df.empty:
+        parts.append("Пропусков нет или датасет пуст.\n\n")
+    else:
+        ####### Колонки с большими пропусками #######
+        if problematic_missing_cols:
+            parts.append(f"Столбцы, выходящие за допустимые пределы по порогу пропусков ({min_missing_share}%):\n\n")
+            parts.append("\n".join(f"- {column}" for column in problematic_missing_cols))  # выводим красиво
+        #############################################
+        parts.append("\n\nСм. файлы `missing.csv` и `missing_matrix.png`.\n\n")
+
+    parts.append("## Корреляция числовых признаков\n\n")
+    if corr_df.empty:
+        parts.append("Недостаточно числовых колонок для корреляции.\n\n")
+    else:
+        parts.append("См. `correlation.csv` и `correlation_heatmap.png`.\n\n")
+
+    parts.append("## Категориальные признаки\n\n")
+    if not top_cats:
+        parts.append("Категориальные/строковые признаки не найдены.\n\n")
+    else:
+        parts.append("См. файлы в папке `top_categories/`.\n\n")
+
+    parts.append("## Гистограммы числовых колонок\n\n")
+    parts.append("См. файлы `hist_*.png`.\n")
+
+    md_path.write_text("".join(parts), encoding="utf-8")
+
+    # 5. Картинки (savefig – самая дорогая часть, рисуем параллельно)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [
+            pool.submit(
+                plot_histograms_per_column,
+                df,
+                out_root,
+                max_columns=max_hist_columns,
+                numeric_cols=numeric_cols,
+            ),
+            pool.submit(plot_missing_matrix, df, out_root / "missing_matrix.png"),
+        ]
+        if not corr_df.empty:
+            futures.append(pool.submit(plot_correlation_heatmap, df, out_root / "correlation_heatmap.png"))
+        for future in futures:
+            future.result()
 
     typer.echo(f"Отчёт сгенерирован в каталоге: {out_root}")
     typer.echo(f"- Основной markdown: {md_path}")
-    typer.echo("- Табличные файлы: summary.csv, missing.csv, correlation.csv, top_categories/*.csv")
-    typer.echo("- Графики: hist_*.png, missing_matrix.png, correlation_heatmap.png")
+    table_files = ["summary.csv"]
+    if not missing_df.empty:
+        table_files.append("missing.csv")
+    if not corr_df.empty:
+        table_files.append("correlation.csv")
+    table_files.append("top_categories/*.csv")
+    plot_files = ["hist_*.png", "missing_matrix.png"]
+    if not corr_df.empty:
+        plot_files.append("correlation_heatmap.png")
+    typer.echo(f"- Табличные файлы: {', '.join(table_files)}")
+    typer.echo(f"- Графики: {', '.join(plot_files)}")
 
 
 if __name__ == "__main__":
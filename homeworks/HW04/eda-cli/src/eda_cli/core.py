@@ -1,11 +1,42 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence
 
 import pandas as pd
+import pyarrow as pa
 import typer
 from pandas.api import types as ptypes
+from pyarrow import csv as pa_csv
+
+# CSV читаем движком pyarrow: парсинг многопоточный в C++. Колонки остаются
+# numpy-типами (dtype_backend не меняем), чтобы эвристики ниже работали как раньше.
+CSV_ENGINE = "pyarrow"
+
+
+def read_csv(source: Any, sep: str = ",", encoding: str = "utf-8") -> pd.DataFrame:
+    """
+    Чтение CSV движком CSV_ENGINE (pyarrow).
+
+    pyarrow при невалидной кодировке не падает, а отдаёт колонку bytes-объектов –
+    такой случай превращаем в ValueError, как у C-движка. Кроме того, pyarrow сам
+    распознаёт ISO-даты: такие колонки приходят как datetime.date (object) или
+    datetime64, а не str.
+    """
+    df = pd.read_csv(source, sep=sep, encoding=encoding, engine=CSV_ENGINE)
+    for name in df.columns:
+        s = df[name]
+        if not ptypes.is_object_dtype(s):
+            continue
+        first_idx = s.first_valid_index()
+        if first_idx is not None and isinstance(s.loc[first_idx], bytes):
+            raise ValueError(f"колонка '{name}' не декодируется в кодировке {encoding}")
+    return df
+
+
+# Порог std, ниже которого числовая колонка считается почти константной
+LOW_STD_THRESHOLD = 1e-6
 
 
 @dataclass
@@ -41,9 +72,41 @@ class DatasetSummary:
         }
 
 
+@dataclass
+class ColumnStats:
+    """
+    Статистики по колонкам, посчитанные за один проход по df.
+    Переиспользуются в summarize_dataset и missing_table.
+    """
+
+    null_counts: pd.Series
+    nunique: pd.Series
+    numeric_cols: List[str]
+    numeric_stats: pd.DataFrame  # строки min/max/mean/std, колонки – numeric_cols
+
+
+def precompute_stats(df: pd.DataFrame) -> ColumnStats:
+    """
+    Один раз считает пропуски, число уникальных и базовые числовые статистики
+    для всех колонок, чтобы хелперы ниже не сканировали df повторно.
+    """
+    numeric_cols = [name for name in df.columns if ptypes.is_numeric_dtype(df[name])]
+    if numeric_cols:
+        numeric_stats = df[numeric_cols].agg(["min", "max", "mean", "std"])
+    else:
+        numeric_stats = pd.DataFrame(index=["min", "max", "mean", "std"])
+    return ColumnStats(
+        null_counts=df.isna().sum(),
+        nunique=df.nunique(dropna=True),
+        numeric_cols=numeric_cols,
+        numeric_stats=numeric_stats,
+    )
+
+
 def summarize_dataset(
         df: pd.DataFrame,
         example_values_per_column: int = 3,
+        stats: Optional[ColumnStats] = None,
 ) -> DatasetSummary:
     """
     Полный обзор датасета по колонкам:
@@ -53,18 +116,24 @@ def summarize_dataset(
     - количество уникальных;
     - несколько примерных значений;
     - базовые числовые статистики (для numeric).
+
+    stats – результат precompute_stats(df), если он уже посчитан.
     """
+    if stats is None:
+        stats = precompute_stats(df)
+
     n_rows, n_cols = df.shape
     columns: List[ColumnSummary] = []
+    numeric_cols = set(stats.numeric_cols)
 
     for name in df.columns:
         s = df[name]
         dtype_str = str(s.dtype)
 
-        non_null = int(s.notna().sum())
-        missing = n_rows - non_null
+        missing = int(stats.null_counts[name])
+        non_null = n_rows - missing
         missing_share = float(missing / n_rows) if n_rows > 0 else 0.0
-        unique = int(s.nunique(dropna=True))
+        unique = int(stats.nunique[name])
 
         # Примерные значения выводим как строки
         examples = (
@@ -73,17 +142,18 @@ def summarize_dataset(
             else []
         )
 
-        is_numeric = bool(ptypes.is_numeric_dtype(s))
+        is_numeric = name in numeric_cols
         min_val: Optional[float] = None
         max_val: Optional[float] = None
         mean_val: Optional[float] = None
         std_val: Optional[float] = None
 
         if is_numeric and non_null > 0:
-            min_val = float(s.min())
-            max_val = float(s.max())
-            mean_val = float(s.mean())
-            std_val = float(s.std())
+            col_stats = stats.numeric_stats[name]
+            min_val = float(col_stats["min"])
+            max_val = float(col_stats["max"])
+            mean_val = float(col_stats["mean"])
+            std_val = float(col_stats["std"])
 
         columns.append(
             ColumnSummary(
@@ -105,14 +175,14 @@ def summarize_dataset(
     return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=columns)
 
 
-def missing_table(df: pd.DataFrame) -> pd.DataFrame:
+def missing_table(df: pd.DataFrame, stats: Optional[ColumnStats] = None) -> pd.DataFrame:
     """
     Таблица пропусков по колонкам: count/share.
     """
     if df.empty:
         return pd.DataFrame(columns=["missing_count", "missing_share"])
 
-    total = df.isna().sum()
+    total = stats.null_counts if stats is not None else df.isna().sum()
     share = total / len(df)
     result = (
         pd.DataFrame(
@@ -171,12 +241,21 @@ def top_categories(
     return result
 
 
-def compute_quality_flags(summary: DatasetSummary, missing_df: pd.DataFrame) -> Dict[str, Any]:
+def compute_quality_flags(
+        summary: DatasetSummary,
+        missing_df: pd.DataFrame,
+        min_missing_share: float = 0.25,
+) -> Dict[str, Any]:
     """
     Простейшие эвристики «качества» данных:
     - слишком много пропусков;
     - подозрительно мало строк;
     и т.п.
+
+    Кроме флагов возвращает high_missing_columns – колонки с долей пропусков
+    не ниже min_missing_share (0..1) – и problematic_columns – отсортированный
+    список колонок, которые константны, высококардинальны, почти без разброса
+    или входят в high_missing_columns.
     """
     flags: Dict[str, Any] = {}
     flags["too_few_rows"] = summary.n_rows < 100
@@ -194,29 +273,44 @@ def compute_quality_flags(summary: DatasetSummary, missing_df: pd.DataFrame) ->
     if summary.n_cols > 100:
         score -= 0.1
 
-    #  Новые эвристики
-
-    # Наличие константых колонок
-    flags["has_constant_columns"] = any(
-        col.unique == 1
-        for col in summary.columns
-    )
+    #  Новые эвристики – флаги и имена проблемных колонок собираем за один проход
 
     # Категориальные признаки с большим числом уникальных
     HIGH_CARDINALITY_THRESHOLD = max(50, int(0.3 * summary.n_rows))
-    flags["has_high_cardinality_categoricals"] = any(
-        (not col.is_numeric) and col.unique > HIGH_CARDINALITY_THRESHOLD
-        for col in summary.columns
-    )
-
-    # Проверка id-подобных колонок на дубликаты
+    # id-подобные колонки проверяем на дубликаты
     possible_id_names = {"id", "user_id", "userid", "uid", "uuid"}
-    flags["has_suspicious_id_duplicates"] = False
+
+    # Колонки с долей пропусков не ниже порога (в порядке missing_df – по убыванию доли)
+    if missing_df.empty:
+        high_missing_columns = []
+    else:
+        mask = missing_df["missing_share"].to_numpy() >= min_missing_share
+        high_missing_columns = missing_df.index.to_numpy()[mask].tolist()
+    problematic = set(high_missing_columns)
+
+    has_constant_columns = False
+    has_high_cardinality_categoricals = False
+    has_suspicious_id_duplicates = False
     for col in summary.columns:
-        if col.name.lower() in possible_id_names:
-            if col.unique < summary.n_rows:
-                flags["has_suspicious_id_duplicates"] = True
-                break
+        # константная колонка
+        if col.unique == 1:
+            has_constant_columns = True
+            problematic.add(col.name)
+        # категориальная колонка с высокой кардинальностью
+        if (not col.is_numeric) and col.unique > HIGH_CARDINALITY_THRESHOLD:
+            has_high_cardinality_categoricals = True
+            problematic.add(col.name)
+        # числовая колонка почти без разброса
+        if col.is_numeric and col.non_null > 1 and col.std is not None and col.std < LOW_STD_THRESHOLD:
+            problematic.add(col.name)
+        if col.name.lower() in possible_id_names and col.unique < summary.n_rows:
+            has_suspicious_id_duplicates = True
+
+    flags["has_constant_columns"] = has_constant_columns
+    flags["has_high_cardinality_categoricals"] = has_high_cardinality_categoricals
+    flags["has_suspicious_id_duplicates"] = has_suspicious_id_duplicates
+    flags["high_missing_columns"] = high_missing_columns
+    flags["problematic_columns"] = sorted(problematic)
 
     # Меняем в т.ч. изменение скора
     if flags.get("has_constant_columns"):
@@ -234,6 +328,17 @@ def compute_quality_flags(summary: DatasetSummary, missing_df: pd.DataFrame) ->
     return flags
 
 
+def write_csv(df: pd.DataFrame, path: Path, index: bool = False) -> None:
+    """
+    Сохранение таблицы в CSV векторизованным writer'ом pyarrow.
+    Формат – как у pyarrow: строки в кавычках, bool как true/false.
+    """
+    if index:
+        df = df.reset_index(names=df.index.name or "")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa_csv.write_csv(table, path)
+
+
 def flatten_summary_for_print(summary: DatasetSummary) -> pd.DataFrame:
     """
     Превращает DatasetSummary в табличку для более удобного вывода.
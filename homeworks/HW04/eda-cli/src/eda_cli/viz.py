@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Iterable, List, Union
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.figure import Figure
 
 PathLike = Union[str, Path]
 
+# Фигуры создаются напрямую через Figure, а не через pyplot: так нет общего
+# глобального состояния, и графики можно рисовать параллельно из разных потоков.
+
 
 def _ensure_dir(path: PathLike) -> Path:
     p = Path(path)
@@ -21,21 +24,25 @@ def plot_histograms_per_column(
     out_dir: PathLike,
     max_columns: int = 6,
     bins: int = 20,
+    numeric_cols: Optional[Sequence[str]] = None,
 ) -> List[Path]:
     """
     Для числовых колонок строит по отдельной гистограмме.
+    Если numeric_cols не передан, числовые колонки определяются по dtypes.
     Возвращает список путей к PNG.
     """
     out_dir = _ensure_dir(out_dir)
-    numeric_df = df.select_dtypes(include="number")
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include="number").columns
 
     paths: List[Path] = []
-    for i, name in enumerate(numeric_df.columns[:max_columns]):
-        s = numeric_df[name].dropna()
+    for i, name in enumerate(list(numeric_cols)[:max_columns]):
+        s = df[name].dropna()
         if s.empty:
             continue
 
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.subplots()
         ax.hist(s.values, bins=bins)
         ax.set_title(f"Histogram of {name}")
         ax.set_xlabel(name)
@@ -44,7 +51,6 @@ def plot_histograms_per_column(
 
         out_path = out_dir / f"hist_{i+1}_{name}.png"
         fig.savefig(out_path)
-        plt.close(fig)
 
         paths.append(out_path)
 
@@ -60,12 +66,14 @@ def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike) -> Path:
 
     if df.empty:
         # Рисуем пустой график
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.subplots()
         ax.text(0.5, 0.5, "Empty dataset", ha="center", va="center")
         ax.axis("off")
     else:
         mask = df.isna().values
-        fig, ax = plt.subplots(figsize=(min(12, df.shape[1] * 0.4), 4))
+        fig = Figure(figsize=(min(12, df.shape[1] * 0.4), 4))
+        ax = fig.subplots()
         ax.imshow(mask, aspect="auto", interpolation="none")
         ax.set_xlabel("Columns")
         ax.set_ylabel("Rows")
@@ -76,7 +84,6 @@ def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike) -> Path:
 
     fig.tight_layout()
     fig.savefig(out_path)
-    plt.close(fig)
     return out_path
 
 
@@ -89,12 +96,14 @@ def plot_correlation_heatmap(df: pd.DataFrame, out_path: PathLike) -> Path:
 
     numeric_df = df.select_dtypes(include="number")
     if numeric_df.shape[1] < 2:
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.subplots()
         ax.text(0.5, 0.5, "Not enough numeric columns for correlation", ha="center", va="center")
         ax.axis("off")
     else:
         corr = numeric_df.corr(numeric_only=True)
-        fig, ax = plt.subplots(figsize=(min(10, corr.shape[1]), min(8, corr.shape[0])))
+        fig = Figure(figsize=(min(10, corr.shape[1]), min(8, corr.shape[0])))
+        ax = fig.subplots()
         im = ax.imshow(corr.values, vmin=-1, vmax=1, cmap="coolwarm", aspect="auto")
         ax.set_xticks(range(corr.shape[1]))
         ax.set_xticklabels(corr.columns, rotation=90, fontsize=8)
@@ -105,7 +114,6 @@ def plot_correlation_heatmap(df: pd.DataFrame, out_path: PathLike) -> Path:
 
     fig.tight_layout()
     fig.savefig(out_path)
-    plt.close(fig)
     return out_path
 
 
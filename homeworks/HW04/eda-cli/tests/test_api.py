@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from eda_cli import api
+from eda_cli.api import app
+
+client = TestClient(app)
+
+
+def test_quality_from_csv_invalid_encoding_returns_400():
+    resp = client.post(
+        "/quality-from-csv",
+        files={"file": ("broken.csv", b"a;b\n1;\xef\n", "text/csv")},
+    )
+
+    assert resp.status_code == 400
+
+
+def _capture_frames(monkeypatch) -> list:
+    """Подменяет summarize_dataset в api, чтобы увидеть DataFrame, дошедший до EDA-ядра."""
+    frames = []
+    original = api.summarize_dataset
+
+    def spy(df, *args, **kwargs):
+        frames.append(df)
+        return original(df, *args, **kwargs)
+
+    monkeypatch.setattr(api, "summarize_dataset", spy)
+    return frames
+
+
+def test_quality_from_dataframe_applies_explicit_dtypes(monkeypatch):
+    frames = _capture_frames(monkeypatch)
+
+    resp = client.post(
+        "/quality-from-dataframe",
+        json={"columns": {"id": ["1", "2", "3"], "city": ["A", "B", "A"]}, "dtypes": {"id": "int32"}},
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["dataset_shape"] == {"n_rows": 3, "n_cols": 2}
+    assert str(frames[0]["id"].dtype) == "int32"
+
+
+def test_quality_from_dataframe_converts_dtypes_without_hints(monkeypatch):
+    frames = _capture_frames(monkeypatch)
+
+    resp = client.post(
+        "/quality-from-dataframe",
+        json={"columns": {"age": [10, None, 30], "city": ["A", "B", None]}},
+    )
+
+    assert resp.status_code == 200
+    assert str(frames[0]["age"].dtype) == "Int64"
+    assert 0.0 <= resp.json()["quality_score"] <= 1.0
+
+
+def test_quality_from_dataframe_unknown_dtype_column_returns_400():
+    resp = client.post(
+        "/quality-from-dataframe",
+        json={"columns": {"a": [1, 2]}, "dtypes": {"missing": "int64"}},
+    )
+
+    assert resp.status_code == 400
+
+
+def test_quality_from_dataframe_unequal_lengths_returns_422():
+    resp = client.post(
+        "/quality-from-dataframe",
+        json={"columns": {"a": [1, 2], "b": [1]}},
+    )
+
+    assert resp.status_code == 422
+
+
+def test_quality_from_dataframe_nested_values_return_422():
+    resp = client.post(
+        "/quality-from-dataframe",
+        json={"columns": {"a": [[1], [2]], "b": [{"x": 1}, {"x": 2}]}},
+    )
+
+    assert resp.status_code == 422
+
+
+def test_app_serves_requests_across_lifespan_restarts():
+    for _ in range(2):
+        with TestClient(app) as lifespan_client:
+            resp = lifespan_client.post(
+                "/quality-from-dataframe",
+                json={"columns": {"a": [1, 2, 3], "b": ["x", "y", "z"]}},
+            )
+            assert resp.status_code == 200
+
+
+@pytest.mark.parametrize("endpoint", ["/quality-from-csv", "/quality-flags-from-csv"])
+@pytest.mark.parametrize(
+    ("filename", "content_type", "expected_status"),
+    [
+        ("data.csv", "text/csv", 200),
+        ("data.TXT", "application/octet-stream", 200),
+        ("data.csv", "image/png", 400),
+        ("data.png", "text/csv", 400),
+    ],
+)
+def test_csv_upload_requires_content_type_and_extension(endpoint, filename, content_type, expected_status):
+    resp = client.post(endpoint, files={"file": (filename, b"a,b\n1,x\n2,y\n", content_type)})
+
+    assert resp.status_code == expected_status
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+
+from typer.testing import CliRunner
+
+from eda_cli import cli
+
+runner = CliRunner()
+
+
+def _reject_constant(token: str):
+    raise AssertionError(f"в JSON попал невалидный токен {token}")
+
+
+def _write_csv(tmp_path, text: str):
+    path = tmp_path / "data.csv"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_report_json_summary_is_valid_json_with_and_without_orjson(tmp_path, monkeypatch):
+    # у single_value одно непустое значение -> std = NaN
+    csv_path = _write_csv(tmp_path, "value,single_value\n1,5\n2,\n3,\n")
+
+    results = []
+    for orjson_module in (cli.orjson, None):
+        monkeypatch.setattr(cli, "orjson", orjson_module)
+        out_dir = tmp_path / f"out_{orjson_module is None}"
+        result = runner.invoke(cli.app, ["report", str(csv_path), "--out-dir", str(out_dir), "--json-summary"])
+        assert result.exit_code == 0, result.output
+
+        text = (out_dir / "summary.json").read_text(encoding="utf-8")
+        results.append(json.loads(text, parse_constant=_reject_constant))
+
+    assert results[0] == results[1]
+    columns = {c["name"]: c for c in results[0]["summary"]["columns"]}
+    assert columns["single_value"]["std"] is None
+
+
+def test_report_header_only_csv_writes_only_report_md(tmp_path):
+    csv_path = _write_csv(tmp_path, "a,b\n")
+    out_dir = tmp_path / "out"
+
+    result = runner.invoke(cli.app, ["report", str(csv_path), "--out-dir", str(out_dir)])
+
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in out_dir.iterdir()) == ["report.md"]
+
+
+def test_report_single_row_keeps_json_summary(tmp_path):
+    csv_path = _write_csv(tmp_path, "a,b\n1,x\n")
+    out_dir = tmp_path / "out"
+
+    result = runner.invoke(cli.app, ["report", str(csv_path), "--out-dir", str(out_dir), "--json-summary"])
+
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in out_dir.iterdir()) == ["report.md", "summary.json"]
+    data = json.loads((out_dir / "summary.json").read_text(encoding="utf-8"))
+    assert data["summary"]["n_rows"] == 1
+
+
+def test_report_single_numeric_column_skips_correlation(tmp_path):
+    csv_path = _write_csv(tmp_path, "value,city\n1,A\n2,B\n3,A\n")
+    out_dir = tmp_path / "out"
+
+    result = runner.invoke(cli.app, ["report", str(csv_path), "--out-dir", str(out_dir)])
+
+    assert result.exit_code == 0, result.output
+    assert not (out_dir / "correlation.csv").exists()
+    assert not (out_dir / "correlation_heatmap.png").exists()
+    assert "correlation.csv" not in result.output
+    assert "correlation_heatmap.png" not in result.output
+    assert "Недостаточно числовых колонок" in (out_dir / "report.md").read_text(encoding="utf-8")
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import datetime
+import io
+
 import pandas as pd
+import pytest
+from pandas.api import types as ptypes
 
 from eda_cli.core import (
     compute_quality_flags,
     correlation_matrix,
     flatten_summary_for_print,
     missing_table,
+    precompute_stats,
+    read_csv,
     summarize_dataset,
     top_categories,
+    write_csv,
 )
+from eda_cli.viz import plot_histograms_per_column
 
 
 def _sample_df() -> pd.DataFrame:
@@ -109,3 +118,80 @@ def test_quality_flags_suspicious_id_duplicates():
     assert flags["has_suspicious_id_duplicates"] is True
     assert 0.0 <= flags["quality_score"] <= 1.0
 #####################################################################
+
+
+def test_summarize_dataset_with_precomputed_stats():
+    df = _sample_df()
+    df["flag"] = [True, False, True, True]
+    stats = precompute_stats(df)
+
+    assert summarize_dataset(df, stats=stats) == summarize_dataset(df)
+    assert missing_table(df, stats=stats).equals(missing_table(df))
+
+
+def test_quality_flags_problematic_columns():
+    df = pd.DataFrame(
+        {
+            "constant_col": [1, 1, 1, 1],
+            "mostly_missing": [None, None, None, 4],
+            "value": [10, 20, 30, 40],
+        }
+    )
+
+    summary = summarize_dataset(df)
+    missing_df = missing_table(df)
+    flags = compute_quality_flags(summary, missing_df, min_missing_share=0.5)
+
+    assert flags["problematic_columns"] == ["constant_col", "mostly_missing"]
+    assert flags["high_missing_columns"] == ["mostly_missing"]
+
+
+def test_read_csv_rejects_invalid_encoding():
+    with pytest.raises(ValueError):
+        read_csv(io.BytesIO(b"a,b\n1,\xef\n"), encoding="utf-8")
+
+
+@pytest.mark.parametrize("index", [False, True])
+def test_write_csv_round_trip(tmp_path, index):
+    df = pd.DataFrame(
+        {
+            "name": ["a", "b, c", None],
+            "count": [1, 2, 3],
+            "share": [0.5, 1.0, None],
+            "flag": [True, False, True],
+        },
+        index=["x", "y", "z"],
+    )
+    path = tmp_path / "table.csv"
+
+    write_csv(df, path, index=index)
+    restored = pd.read_csv(path, index_col=0 if index else None)
+
+    expected = df if index else df.reset_index(drop=True)
+    pd.testing.assert_frame_equal(restored, expected, check_dtype=False, check_index_type=False)
+
+
+def test_read_csv_parses_iso_dates():
+    # pyarrow-движок сам распознаёт ISO-даты: колонка приходит как datetime.date, а не str
+    df = read_csv(io.BytesIO(b"day,ts,value\n2024-01-02,2024-01-02 10:00:00,1\n2024-01-03,,2\n"))
+
+    assert ptypes.is_object_dtype(df["day"])
+    assert df["day"].iloc[0] == datetime.date(2024, 1, 2)
+    assert ptypes.is_datetime64_any_dtype(df["ts"])
+
+
+def test_write_csv_format_is_pinned(tmp_path):
+    path = tmp_path / "table.csv"
+
+    write_csv(pd.DataFrame({"name": ["a"], "flag": [False], "share": [1.0]}), path)
+
+    assert path.read_text(encoding="utf-8") == '"name","flag","share"\n"a",false,1\n'
+
+
+def test_plot_histograms_uses_given_numeric_cols(tmp_path):
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [4.0, 5.0, 6.0], "city": ["A", "B", "A"]})
+
+    paths = plot_histograms_per_column(df, tmp_path, numeric_cols=["b"])
+
+    assert [p.name for p in paths] == ["hist_1_b.png"]
+    assert all(p.exists() for p in paths)